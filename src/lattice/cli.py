@@ -18,6 +18,7 @@ from lattice.config import (
     DEFAULT_TAG_AUDIT_OUTPUT,
     DEFAULT_BITRATE_AUDIT_OUTPUT,
     DEFAULT_PLAYLIST_OUTPUT,
+    DEFAULT_WORKERS,
 )
 
 from lattice.modes.library import write_music_library_tree, write_ai_library, write_all_wings, write_ai_wings
@@ -64,8 +65,17 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--layout", default="{artist}/{album}", help="Directory structure pattern for extracting tags from path (default: {artist}/{album})")
     p.add_argument("--min-art-res", type=int, default=500, help="Minimum resolution in pixels for --auditArtQuality (default: 500)")
     p.add_argument("--min-bitrate", type=int, default=192, help="Minimum bitrate in kbps for --auditBitrate (default: 192)")
-    p.add_argument("--workers", type=int, default=4, help="Parallel workers (integrity modes)")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                   help="Parallel workers (integrity checks and tag reads; default: CPU count)")
     p.add_argument("--prefer", choices=["flac", "ffmpeg"], default="flac", help="Preferred tool (FLAC mode)")
+    p.add_argument("--fast", action="store_true",
+                   help="Check FLAC stream structure only, skipping the full decode; "
+                        "--skip-verified and --largest-first have no effect with it (FLAC mode)")
+    p.add_argument("--skip-verified", action="store_true",
+                   help="Skip FLACs whose size and mtime are unchanged since they last passed a full check; "
+                        "cannot detect later bit rot (FLAC mode)")
+    p.add_argument("--largest-first", action="store_true",
+                   help="Check the largest FLACs first instead of in directory order (FLAC mode)")
     p.add_argument("--quiet", action="store_true", help="Minimize output")
     p.add_argument("--genres", action="store_true", help="Include album genres in library tree")
     p.add_argument("--paths", action="store_true", help="Include absolute directory paths at the album level")
@@ -87,7 +97,8 @@ def main(argv: Optional[List[str]] = None) -> int:
         return interactive_menu()
 
     try:
-        args = build_parser().parse_args(argv)
+        parser = build_parser()
+        args = parser.parse_args(argv)
         
         raw_root = args.pos_root if args.pos_root is not None else args.root
 
@@ -113,25 +124,32 @@ def main(argv: Optional[List[str]] = None) -> int:
 
         if args.library:
             output = args.output or DEFAULT_LIBRARY_OUTPUT
-            write_music_library_tree(root, output, layout=args.layout, quiet=args.quiet, show_genre=args.genres)
+            write_music_library_tree(root, output, layout=args.layout, quiet=args.quiet, show_genre=args.genres,
+                                     workers=args.workers)
             return 0
 
         if args.ai_library:
             output = args.output or DEFAULT_AI_LIBRARY_OUTPUT
-            write_ai_library(root, output, layout=args.layout, quiet=args.quiet)
+            write_ai_library(root, output, layout=args.layout, quiet=args.quiet, workers=args.workers)
             return 0
 
         if args.all_wings:
             outdir = args.output or "wings"
-            return write_all_wings(root, outdir, layout=args.layout, quiet=args.quiet, show_genre=args.genres, show_paths=args.paths)
+            return write_all_wings(root, outdir, layout=args.layout, quiet=args.quiet, show_genre=args.genres, show_paths=args.paths,
+                                   workers=args.workers)
 
         if args.ai_wings:
             outdir = args.output or "wings_ai"
-            return write_ai_wings(root, outdir, layout=args.layout, quiet=args.quiet)
+            return write_ai_wings(root, outdir, layout=args.layout, quiet=args.quiet, workers=args.workers)
 
         if args.testFLAC:
             output = args.output or DEFAULT_FLAC_OUTPUT
-            return run_flac_mode(root, output, args.workers, args.prefer, quiet=args.quiet)
+            if args.fast:
+                for flag, given in (("--skip-verified", args.skip_verified), ("--largest-first", args.largest_first)):
+                    if given:
+                        print(f"[warn] {flag} has no effect with --fast", file=sys.stderr)
+            return run_flac_mode(root, output, args.workers, args.prefer, quiet=args.quiet, fast=args.fast,
+                                 skip_verified=args.skip_verified, largest_first=args.largest_first)
 
         if args.testMP3:
             output = args.output or DEFAULT_MP3_OUTPUT
@@ -186,13 +204,14 @@ def main(argv: Optional[List[str]] = None) -> int:
 
         if args.playlist:
             output = args.output or DEFAULT_PLAYLIST_OUTPUT
-            return generate_playlist(root, output, args.rule, layout=args.layout, quiet=args.quiet)
+            return generate_playlist(root, output, args.rule, layout=args.layout, quiet=args.quiet,
+                                     workers=args.workers)
 
         if args.stats:
-            run_stats(root, args.output, quiet=args.quiet)
+            run_stats(root, args.output, quiet=args.quiet, workers=args.workers)
             return 0
 
-        build_parser().print_help()
+        parser.print_help()
         return 2
     except KeyboardInterrupt:
         print("\nInterrupted by user.")
@@ -1,4 +1,3 @@
-import re
 import os
 import json
 from typing import Optional
@@ -20,6 +19,8 @@ DEFAULT_AI_LIBRARY_OUTPUT = "library_ai.txt"
 DEFAULT_STATS_OUTPUT = "library_stats.txt"
 DEFAULT_PLAYLIST_OUTPUT = "smart_playlist.m3u"
 
+DEFAULT_WORKERS = os.cpu_count() or 4
+
 AUDIO_EXTENSIONS = {'.mp3', '.flac', '.ogg', '.opus', '.m4a', '.wav', '.wma', '.aac'}
 
 COVER_NAMES = {"cover.jpg", "cover.jpeg", "cover.png",
@@ -29,14 +30,8 @@ COVER_NAMES = {"cover.jpg", "cover.jpeg", "cover.png",
 
 ART_FORMAT_PRIORITY = ['.flac', '.opus', '.ogg', '.m4a', '.mp3']
 
-RE_CLEAN_PREFIX = re.compile(r'^[^\-\d]*-\s*')
-RE_CLEAN_PATTERNS = [
-    re.compile(r'^(?:\d+\s*[-–—]\s*)?(\d+)\.?\s*[-–—]?\s*(.+)$'),
-    re.compile(r'^[Tt]rack\s*(\d+)\.?\s*[-–—]?\s*(.+)$'),
-    re.compile(r'^(\d+)\s+(.+)$')
-]
-
 CONFIG_FILE = os.path.expanduser("~/.config/lattice/config.json")
+FLAC_VERIFIED_FILE = os.path.expanduser("~/.config/lattice/flac_verified.json")
 
 def load_config() -> dict:
     if os.path.exists(CONFIG_FILE):
@@ -59,3 +54,36 @@ def set_library_root(root: str) -> None:
     config = load_config()
     config["library_root"] = os.path.abspath(os.path.expanduser(root))
     save_config(config)
+
+def load_flac_verified() -> dict:
+    """path -> [size, mtime_ns] of FLACs that passed a full decode check.
+
+    An unreadable or malformed cache loads as {} (malformed entries are
+    dropped), so the worst case is one full re-check.
+    """
+    if not os.path.exists(FLAC_VERIFIED_FILE):
+        return {}
+    try:
+        with open(FLAC_VERIFIED_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {path: sig for path, sig in data.items()
+            if isinstance(sig, list) and len(sig) == 2 and all(type(v) is int for v in sig)}
+
+def save_flac_verified(verified: dict) -> None:
+    """Write the cache to a temp file and swap it in, so a partial write never replaces it."""
+    os.makedirs(os.path.dirname(FLAC_VERIFIED_FILE), exist_ok=True)
+    tmp = f"{FLAC_VERIFIED_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(verified, f)
+        os.replace(tmp, FLAC_VERIFIED_FILE)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
@@ -6,9 +6,9 @@ from collections import defaultdict, Counter
 from difflib import SequenceMatcher
 from typing import Dict, List, NamedTuple, Optional, Tuple
 
-from lattice.utils import is_audio, count_audio_files, _make_pbar
+from lattice.utils import walk_audio_dirs, _make_pbar
 from lattice.tags import get_all_tags, HAVE_MUTAGEN_BASE, TagBundle
-from lattice.config import AUDIO_EXTENSIONS, DEFAULT_DUPLICATES_OUTPUT, DEFAULT_TAG_AUDIT_OUTPUT
+from lattice.config import DEFAULT_DUPLICATES_OUTPUT, DEFAULT_TAG_AUDIT_OUTPUT
 
 # =====================================
 # Mode: Duplicate detection
@@ -23,17 +23,18 @@ _QUOTE_DASH_FOLD = {
     "–": "-", "—": "-", "―": "-",
 }
 
+_QUOTE_DASH_TABLE = str.maketrans(_QUOTE_DASH_FOLD)
+
 _WS_RUN = re.compile(r"\s+")
-_PAREN_TAIL = re.compile(r"\s*[\(\[][^\(\[\)\]]*[\)\]]\s*$")
+# One or more trailing (...) / [...] groups, removed in a single sub
+_PAREN_TAILS = re.compile(r"(?:\s*[\(\[][^\(\[\)\]]*[\)\]])+\s*$")
 _FEAT = re.compile(r"\s+(?:feat\.?|featuring|ft\.?)\s+.+$", re.IGNORECASE)
 
 
 def _norm_key(s: Optional[str]) -> str:
     if not s:
         return ""
-    s = unicodedata.normalize("NFKC", s)
-    for k, v in _QUOTE_DASH_FOLD.items():
-        s = s.replace(k, v)
+    s = unicodedata.normalize("NFKC", s).translate(_QUOTE_DASH_TABLE)
     return _WS_RUN.sub(" ", s).strip().lower()
 
 
@@ -44,12 +45,7 @@ def _loose_key(s: Optional[str]) -> str:
     if not s:
         return ""
     s = _FEAT.sub("", s)
-    while True:
-        new = _PAREN_TAIL.sub("", s).strip()
-        if new == s:
-            break
-        s = new
-    return s
+    return _PAREN_TAILS.sub("", s).strip()
 
 
 class _DirInfo(NamedTuple):
@@ -81,7 +77,7 @@ def _aggregate_dir(dirpath: str, audio_files: List[str],
             sz = os.path.getsize(fpath)
         except OSError:
             sz = 0
-        ext = os.path.splitext(fname)[1].lower()
+        ext = fname[fname.rfind('.'):].lower()
         total_bytes += sz
         files.append((fname, t, sz))
         formats[ext] += 1
@@ -173,8 +169,8 @@ def _section_multiformat(dirs: List[_DirInfo], root: str, out) -> int:
         by_key: Dict[Tuple[Optional[int], str],
                      Dict[str, Tuple[str, int, Optional[str], str]]] = defaultdict(dict)
         for fname, t, sz in d.files:
-            ext = os.path.splitext(fname)[1].lower()
-            stem = os.path.splitext(fname)[0]
+            stem, ext = os.path.splitext(fname)
+            ext = ext.lower()
             title_for_key = t.title or stem
             key = (t.trackno, _norm_key(title_for_key))
             by_key[key][ext] = (fname, sz, t.title, stem)
@@ -336,17 +332,14 @@ def run_duplicates(root: str, output: str, *, quiet: bool = False) -> int:
     if not quiet:
         print(f"Scanning for duplicates under: {root}")
 
-    total = count_audio_files(root)
+    audio_dirs = walk_audio_dirs(root)
+    total = sum(len(audio_files) for _, audio_files in audio_dirs)
     pbar = _make_pbar(total, "Reading tags", quiet)
 
     tag_cache: Dict[str, TagBundle] = {}
     dirs: List[_DirInfo] = []
 
-    for dirpath, subdirs, files in os.walk(root):
-        subdirs[:] = [d for d in subdirs if not d.startswith('.')]
-        audio_files = sorted(f for f in files if is_audio(f))
-        if not audio_files:
-            continue
+    for dirpath, audio_files in audio_dirs:
         for fname in audio_files:
             fpath = os.path.join(dirpath, fname)
             tag_cache[fpath] = get_all_tags(fpath)
@@ -393,17 +386,13 @@ def run_tag_audit(root: str, output: str, *, quiet: bool = False) -> int:
     if not quiet:
         print(f"Auditing tags under: {root}")
 
-    total = count_audio_files(root)
+    audio_dirs = walk_audio_dirs(root)
+    total = sum(len(audio_files) for _, audio_files in audio_dirs)
     pbar = _make_pbar(total, "Auditing tags", quiet)
 
-    for dirpath, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-
-        for f in sorted(files):
-            ext = os.path.splitext(f)[1].lower()
-            if ext not in AUDIO_EXTENSIONS:
-                continue
-
+    for dirpath, audio_files in audio_dirs:
+        for f in audio_files:
+            ext = f[f.rfind('.'):].lower()
             pbar.update(1)
 
             filepath = os.path.join(dirpath, f)
@@ -486,17 +475,13 @@ def run_bitrate_audit(root: str, output: str, min_kbps: int, *, quiet: bool = Fa
     if not quiet:
         print(f"Auditing bitrates (< {min_kbps} kbps) under: {root}")
 
-    total = count_audio_files(root)
+    audio_dirs = walk_audio_dirs(root)
+    total = sum(len(audio_files) for _, audio_files in audio_dirs)
     pbar = _make_pbar(total, "Auditing bitrates", quiet)
 
-    for dirpath, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-
-        for f in sorted(files):
-            ext = os.path.splitext(f)[1].lower()
-            if ext not in AUDIO_EXTENSIONS:
-                continue
-
+    for dirpath, audio_files in audio_dirs:
+        for f in audio_files:
+            ext = f[f.rfind('.'):].lower()
             pbar.update(1)
 
             filepath = os.path.join(dirpath, f)
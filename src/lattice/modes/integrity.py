@@ -1,33 +1,156 @@
 import os
 import sys
-import subprocess
 import time
-import shutil
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Tuple, List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Tuple, List, Optional, Dict, Any, Callable, Iterable, Iterator
 
-from lattice.utils import run_proc, has_tool, _make_pbar
+from lattice.utils import run_proc_stderr, has_tool, which_tool, _make_pbar, _iter_files
 from lattice.tags import HAVE_MUTAGEN_MP3, MUTAGEN_MP3
 from lattice.config import DEFAULT_FLAC_OUTPUT, DEFAULT_MP3_OUTPUT, DEFAULT_OPUS_OUTPUT, DEFAULT_WAV_OUTPUT, DEFAULT_WMA_OUTPUT
+from lattice.config import load_flac_verified, save_flac_verified
+
+_HAVE_FADVISE = hasattr(os, "posix_fadvise")
+
+def _iter_bounded(ex: ThreadPoolExecutor, fn: Callable, items: Iterable, limit: int) -> Iterator:
+    """Yield fn(item) results in completion order, keeping at most `limit` futures queued.
+
+    Unlike submitting everything up front, memory and executor queue depth
+    stay flat regardless of how many files the scan found.
+    """
+    it = iter(items)
+    inflight = {ex.submit(fn, item) for item in islice(it, limit)}
+    while inflight:
+        done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+        for item in islice(it, len(done)):
+            inflight.add(ex.submit(fn, item))
+        for fut in done:
+            yield fut.result()
 
 # =====================================
 # Mode: FLAC integrity
 # =====================================
 
 def test_with_flac(filepath: str) -> Tuple[bool, str]:
-    code, out, err = run_proc(["flac", "-t", "-s", str(filepath)])
+    code, err = run_proc_stderr([which_tool("flac") or "flac", "-t", "-s", str(filepath)])
     if code == 0:
         return True, ""
-    return False, err or out or f"flac exited with code {code}"
+    return False, err or f"flac exited with code {code}"
 
 def test_with_ffmpeg(filepath: str) -> Tuple[bool, str]:
-    code, out, err = run_proc(["ffmpeg", "-v", "error", "-nostats", "-i", str(filepath), "-f", "null", "-"])
+    code, err = run_proc_stderr([which_tool("ffmpeg") or "ffmpeg", "-v", "error", "-nostats", "-threads", "1", "-i", str(filepath), "-f", "null", "-"])
     if code == 0 and not err:
         return True, ""
     if code == 0 and err:
         return False, err
-    return False, err or out or f"ffmpeg exited with code {code}"
+    return False, err or f"ffmpeg exited with code {code}"
+
+def _syncsafe(b: bytes) -> int:
+    return (b[0] << 21) | (b[1] << 14) | (b[2] << 7) | b[3]
+
+def quick_flac_check(filepath: str) -> Tuple[bool, str]:
+    """Structural FLAC check without decoding audio.
+
+    Verifies the fLaC marker (after an optional ID3v2 prefix), walks the
+    metadata block chain by seeking over block bodies, sanity-checks
+    STREAMINFO, and confirms a frame sync code where audio should start.
+    Catches truncated or mangled headers, not corrupt audio frames.
+    """
+    try:
+        size = os.path.getsize(filepath)
+        with open(filepath, "rb") as f:
+            head = f.read(10)
+            start = 0
+            if head[:3] == b"ID3" and len(head) == 10:
+                start = 10 + _syncsafe(head[6:10]) + (10 if head[5] & 0x10 else 0)
+                f.seek(start)
+                head = f.read(4)
+            if head[:4] != b"fLaC":
+                return False, "missing fLaC stream marker"
+            pos = start + 4
+            first = True
+            while True:
+                f.seek(pos)
+                hdr = f.read(4)
+                if len(hdr) < 4:
+                    return False, f"metadata truncated at byte {pos}"
+                last = hdr[0] & 0x80
+                btype = hdr[0] & 0x7F
+                length = int.from_bytes(hdr[1:4], "big")
+                if first:
+                    if btype != 0 or length != 34:
+                        return False, "first metadata block is not STREAMINFO"
+                    si = f.read(34)
+                    if len(si) < 34:
+                        return False, "STREAMINFO truncated"
+                    min_bs = int.from_bytes(si[0:2], "big")
+                    max_bs = int.from_bytes(si[2:4], "big")
+                    rate = int.from_bytes(si[10:13], "big") >> 4
+                    total_samples = int.from_bytes(si[13:18], "big") & 0xFFFFFFFFF
+                    if min_bs < 16 or min_bs > max_bs or rate == 0:
+                        return False, (f"invalid STREAMINFO (block size {min_bs}-{max_bs}, "
+                                       f"sample rate {rate})")
+                    first = False
+                elif btype == 127:
+                    return False, f"invalid metadata block type at byte {pos}"
+                pos += 4 + length
+                if pos > size:
+                    return False, f"metadata block runs past end of file ({pos} > {size} bytes)"
+                if last:
+                    break
+            if pos == size:
+                if total_samples:
+                    return False, f"no audio frames after metadata (STREAMINFO lists {total_samples} samples)"
+                return True, ""
+            f.seek(pos)
+            sync = f.read(2)
+            if len(sync) < 2 or sync[0] != 0xFF or (sync[1] & 0xFE) != 0xF8:
+                return False, f"no frame sync where audio starts (byte {pos})"
+    except OSError as e:
+        return False, f"read failed: {e}"
+    return True, ""
+
+def _drop_page_cache(filepath: str) -> None:
+    """Tell the OS a fully decoded file's pages won't be needed again.
+
+    The decoder child reads the file once, start to finish; without this a
+    whole-library scan pushes the user's working set out of page cache.
+    No-op where posix_fadvise is unavailable (Windows, macOS).
+    """
+    if not _HAVE_FADVISE:
+        return
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _bad_flac_magic(filepath: str) -> Optional[str]:
+    """Return an error if the file can't start a FLAC stream, else None.
+
+    Costs one 4-byte read, so obviously broken files skip the decoder
+    spawn. Ogg FLAC and ID3v2-prefixed files pass through to the tools.
+    """
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        magic = os.read(fd, 4)
+    finally:
+        os.close(fd)
+    if magic in (b"fLaC", b"OggS") or magic[:3] == b"ID3":
+        return None
+    return f"bad magic: {magic!r}" if magic else "empty file"
+
+def _size_or_zero(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
 
 def test_flac(filepath: str, prefer: str) -> Tuple[bool, str, str]:
     have_flac = has_tool("flac")
@@ -56,9 +179,10 @@ def test_flac(filepath: str, prefer: str) -> Tuple[bool, str, str]:
     # All tools failed — return the last result
     return False, name, msg
 
-def run_flac_mode(root: str, output: str, workers: int, prefer: str, *, quiet: bool = False) -> int:
+def run_flac_mode(root: str, output: str, workers: int, prefer: str, *, quiet: bool = False,
+                  fast: bool = False, skip_verified: bool = False, largest_first: bool = False) -> int:
     root = os.path.abspath(root)
-    flacs = _find_files_by_ext_path(Path(root), ".flac")
+    flacs = _find_files_by_ext(Path(root), ".flac", workers)
     total = len(flacs)
 
     if total == 0:
@@ -66,7 +190,7 @@ def run_flac_mode(root: str, output: str, workers: int, prefer: str, *, quiet: b
             print(f"No FLAC files found under: {root}")
         return 0
 
-    if not (has_tool("flac") or has_tool("ffmpeg")):
+    if not fast and not (has_tool("flac") or has_tool("ffmpeg")):
         if not quiet:
             print("ERROR: Neither 'flac' nor 'ffmpeg' found in PATH.", file=sys.stderr)
         return 2
@@ -74,59 +198,107 @@ def run_flac_mode(root: str, output: str, workers: int, prefer: str, *, quiet: b
     if not quiet:
         print(f"Found {total} FLAC files under: {root}")
 
-    errors: List[Tuple[str, str, str]] = []
+    if largest_first and not fast:
+        flacs.sort(key=_size_or_zero, reverse=True)
+
+    out_path = os.path.abspath(output)
+    report = None
+    counts_pos = 0
+    scanned = n_errors = n_skipped = 0
+    width = len(str(total))
 
-    def worker(path: Path) -> Tuple[str, bool, str, str]:
+    use_cache = skip_verified and not fast
+    previously_ok = load_flac_verified() if use_cache else {}
+    verified: Dict[str, List[int]] = {}
+
+    def counts_line() -> str:
+        return f"Scanned: {scanned:>{width}}  Errors: {n_errors:>{width}}\n"
+
+    def worker(path: str) -> Tuple[str, bool, str, str]:
         try:
-            ok, method, msg = test_flac(str(path), prefer)
-            return str(path), ok, method, msg
+            if fast:
+                ok, msg = quick_flac_check(path)
+                return path, ok, "structure", msg
+            if use_cache:
+                st = os.stat(path)
+                sig = [st.st_size, st.st_mtime_ns]
+                if previously_ok.get(path) == sig:
+                    verified[path] = sig
+                    return path, True, "cached", ""
+            bad = _bad_flac_magic(path)
+            if bad:
+                return path, False, "magic", bad
+            ok, method, msg = test_flac(path, prefer)
+            _drop_page_cache(path)
+            if ok and use_cache:
+                verified[path] = sig
+            return path, ok, method, msg
         except KeyboardInterrupt:
             raise
         except Exception as e:
-            return str(path), False, "exception", repr(e)
+            return path, False, "exception", repr(e)
 
     pbar = _make_pbar(total, "Testing FLACs", quiet)
     ex: Optional[ThreadPoolExecutor] = None
-    futures: Dict = {}
     try:
-        ex = ThreadPoolExecutor(max_workers=max(1, workers))
-        futures = {ex.submit(worker, p): p for p in flacs}
-        for fut in as_completed(futures):
-            path, ok, method, msg = fut.result()
+        n_workers = max(1, min(workers, total))
+        ex = ThreadPoolExecutor(max_workers=n_workers)
+        for path, ok, method, msg in _iter_bounded(ex, worker, flacs, n_workers * 4):
+            scanned += 1
+            if method == "cached":
+                n_skipped += 1
             if not ok:
-                errors.append((path, method, msg))
+                n_errors += 1
+                if report is None:
+                    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+                    report = open(out_path, "w", encoding="utf-8")
+                    report.write("FLAC INTEGRITY REPORT\n")
+                    report.write(f"Root: {root}\n")
+                    counts_pos = report.tell()
+                    report.write(counts_line())
+                    report.write("=" * 60 + "\n\n")
+                rel = os.path.relpath(path, root)
+                report.write(f"  {n_errors:>3}. {rel}\n")
+                report.write(f"       Tool: {method}\n")
+                report.write(f"       Error: {msg}\n\n")
+                report.flush()
             pbar.update(1)
     except KeyboardInterrupt:
         if not quiet:
             print("\nInterrupted by user. Cancelling FLAC checks...")
         if ex is not None:
-            for f in futures:
-                f.cancel()
             ex.shutdown(cancel_futures=True)
         return 130
     finally:
         if ex is not None:
             ex.shutdown(wait=True)
         pbar.close()
+        if report is not None:
+            report.seek(counts_pos)
+            report.write(counts_line())
+            report.flush()
+            os.fsync(report.fileno())
+            report.close()
+
+    if use_cache:
+        real_root = os.path.realpath(root)
+        under_root = os.path.join(real_root, '')
+        kept = {p: sig for p, sig in previously_ok.items()
+                if p != real_root and not p.startswith(under_root)}
+        kept.update(verified)
+        try:
+            save_flac_verified(kept)
+        except OSError as e:
+            print(f"[warn] Could not save verified-file cache: {e}", file=sys.stderr)
+        if n_skipped and not quiet:
+            print(f"Skipped {n_skipped} unchanged FLAC file(s) that passed a previous check.")
 
-    if errors:
-        out_path = os.path.abspath(output)
-        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("FLAC INTEGRITY REPORT\n")
-            f.write(f"Root: {root}\n")
-            f.write(f"Scanned: {total}  Errors: {len(errors)}\n")
-            f.write("=" * 60 + "\n\n")
-            for i, (path, method, msg) in enumerate(errors, 1):
-                rel = os.path.relpath(path, root)
-                f.write(f"  {i:>3}. {rel}\n")
-                f.write(f"       Tool: {method}\n")
-                f.write(f"       Error: {msg}\n\n")
+    if n_errors:
         if not quiet:
-            print(f"❗ Found {len(errors)} problematic FLAC file(s). Wrote details to: {out_path}")
+            print(f"❗ Found {n_errors} problematic FLAC file(s). Wrote details to: {out_path}")
     elif not quiet:
-        print("✅ All FLAC files passed integrity checks.")
-    return 1 if errors else 0
+        print("✅ All FLAC files passed structure checks." if fast else "✅ All FLAC files passed integrity checks.")
+    return 1 if n_errors else 0
 
 # =====================================
 # Mode: MP3 decode check
@@ -136,25 +308,24 @@ def _find_ffmpeg(explicit_path: Optional[str]) -> Optional[str]:
     if explicit_path:
         p = Path(explicit_path)
         return str(p) if p.exists() else None
-    return shutil.which("ffmpeg")
+    return which_tool("ffmpeg")
 
-def _find_files_by_ext_path(root: Path, ext: str) -> List[Path]:
-    """Walk tree and return all files matching extension as Path objects."""
-    out: List[Path] = []
+def _find_files_by_ext(root: Path, ext: str, workers: int = 1) -> List[str]:
+    """Walk tree and return all files matching extension as path strings.
+
+    Sorted by (directory, name) so workers drain one directory at a time,
+    whatever order the parallel walk found them in.
+    """
     root = root.expanduser().resolve()
     if root.is_file() and root.suffix.lower() == ext:
-        return [root]
-    for dirpath, _, files in os.walk(root):
-        for fn in files:
-            if os.path.splitext(fn)[1].lower() == ext:
-                out.append(Path(dirpath) / fn)
-    return out
-
-def _mutagen_header_info(path: Path) -> Dict[str, Any]:
+        return [str(root)]
+    return sorted(_iter_files(str(root), (ext,), workers), key=os.path.split)
+
+def _mutagen_header_info(path: str) -> Dict[str, Any]:
     if not HAVE_MUTAGEN_MP3:
         return {}
     try:
-        audio = MUTAGEN_MP3(path)
+        audio = MUTAGEN_MP3(path, known_frames={})
         info = getattr(audio, 'info', None)
         if not info:
             return {}
@@ -170,34 +341,31 @@ def _mutagen_header_info(path: Path) -> Dict[str, Any]:
     except Exception:
         return {}
 
-def _ffmpeg_decode_check(ffmpeg_path: Optional[str], path: Path) -> Tuple[bool, str]:
+def _ffmpeg_decode_check(ffmpeg_path: Optional[str], path: str) -> Tuple[bool, str]:
     if not ffmpeg_path:
         return True, "FFmpeg not available; skipped decode check (status=warn)"
-    cmd = [ffmpeg_path, "-v", "error", "-nostats", "-hide_banner", "-i", str(path), "-f", "null", "-"]
+    cmd = [ffmpeg_path, "-v", "error", "-nostats", "-hide_banner", "-threads", "1", "-i", path, "-f", "null", "-"]
     try:
-        proc = subprocess.run(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            text=True, encoding="utf-8", errors="replace",
-        )
+        _, stderr = run_proc_stderr(cmd)
     except Exception as e:
         return False, f"FFmpeg invocation failed: {e!r}"
-    stderr = (proc.stderr or "").strip()
+    _drop_page_cache(path)
     if stderr:
         return False, stderr
     return True, "decode ok"
 
-def _scan_one_file(path: Path, ffmpeg_path: Optional[str], *, enrich: bool = False) -> Dict[str, Any]:
+def _scan_one_file(path: str, ffmpeg_path: Optional[str], *, enrich: bool = False) -> Dict[str, Any]:
     """Scan a single audio file for decode errors. If enrich=True, also pull
     mutagen header info (bitrate, duration, sample rate, VBR mode)."""
     row: Dict[str, Any] = {
-        "path": str(path), "size_bytes": None, "status": "ok", "details": "",
+        "path": path, "size_bytes": None, "status": "ok", "details": "",
     }
     if enrich:
         row.update({"duration_s": None, "bitrate_kbps": None,
                      "sample_rate_hz": None, "mode": None, "vbr_mode": None})
 
     try:
-        row["size_bytes"] = path.stat().st_size
+        row["size_bytes"] = os.stat(path).st_size
     except Exception as e:
         row["status"] = "error"
         row["details"] = f"stat failed: {e!r}"
@@ -250,7 +418,7 @@ def _run_decode_scan(
             print("[warn] FFmpeg not found. Install it or pass --ffmpeg /path/to/ffmpeg",
                   file=sys.stderr)
 
-    targets = _find_files_by_ext_path(root_path, ext)
+    targets = _find_files_by_ext(root_path, ext, workers)
 
     if not targets:
         if not quiet:
@@ -264,21 +432,18 @@ def _run_decode_scan(
 
     pbar = _make_pbar(len(targets), f"Scanning {label}", quiet)
     ex: Optional[ThreadPoolExecutor] = None
-    futures: Dict = {}
 
     if verbose:
         only_errors = False
         quiet = False
 
-    try:
-        ex = ThreadPoolExecutor(max_workers=max(1, workers))
-        futures = {
-            ex.submit(_scan_one_file, p, ffmpeg_path, enrich=enrich): p
-            for p in targets
-        }
+    def scan(p: str) -> Dict[str, Any]:
+        return _scan_one_file(p, ffmpeg_path, enrich=enrich)
 
-        for fut in as_completed(futures):
-            row = fut.result()
+    try:
+        n_workers = max(1, min(workers, len(targets)))
+        ex = ThreadPoolExecutor(max_workers=n_workers)
+        for row in _iter_bounded(ex, scan, targets, n_workers * 4):
             status = row.get("status")
             if status == "ok":
                 oks += 1
@@ -296,8 +461,6 @@ def _run_decode_scan(
         if not quiet:
             print(f"\nInterrupted by user. Cancelling {label} scan…", file=sys.stderr)
         if ex is not None:
-            for f in futures:
-                f.cancel()
             ex.shutdown(cancel_futures=True)
         return 130
     finally:
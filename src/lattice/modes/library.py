@@ -4,16 +4,31 @@ import re
 from collections import defaultdict
 from typing import Dict, List, Tuple
 
-from lattice.utils import count_audio_files, _make_pbar, is_audio, clean_song_name, format_rating, parse_layout
-from lattice.tags import get_all_tags, TagBundle
+from lattice.utils import walk_audio_dirs, _make_pbar, clean_song_name, format_rating, parse_layout
+from lattice.tags import read_tags, TagBundle
+from lattice.config import DEFAULT_WORKERS
+
+_UNSAFE_NAME_CHARS = re.compile(r'[^\w\s-]')
+
+def _song_label(song: str, t: TagBundle, album_artist: str) -> str:
+    """`NN. Title`, or `NN. Guest — Title` when the track artist differs; filename-derived if untagged."""
+    if not (t.title or t.artist):
+        return clean_song_name(song)
+    num = f"{int(t.trackno):02d}. " if t.trackno else ""
+    guest = t.artist if t.artist and t.artist != album_artist else None
+    body = f"{guest} — {t.title}" if guest and t.title else (guest or t.title or "")
+    return f"{num}{body}".strip()
 
 # =====================================
 # Mode: Library tree
 # =====================================
 
-def write_music_library_tree(root_dir: str, output_file: str, *, layout: str = "{artist}/{album}", quiet: bool = False, show_genre: bool = False) -> None:
+def write_music_library_tree(root_dir: str, output_file: str, *, layout: str = "{artist}/{album}", quiet: bool = False,
+                             show_genre: bool = False, workers: int = DEFAULT_WORKERS) -> None:
     root_dir = os.path.abspath(root_dir)
-    total_files = count_audio_files(root_dir)
+    root_prefix = len(os.path.join(root_dir, ''))
+    audio_dirs = walk_audio_dirs(root_dir)
+    total_files = sum(len(audio_in_dir) for _, audio_in_dir in audio_dirs)
     if not quiet:
         print(f"Found {total_files} audio files to process under: {root_dir}\n")
 
@@ -22,21 +37,18 @@ def write_music_library_tree(root_dir: str, output_file: str, *, layout: str = "
     # directory -> {artist: str, album: str, songs: list}
     albums_by_dir: Dict[str, Dict] = {}
 
-    for dirpath, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        audio_in_dir = [f for f in files if is_audio(f)]
-        if not audio_in_dir:
-            continue
-            
+    paths = [os.path.join(dirpath, f) for dirpath, audio_in_dir in audio_dirs for f in audio_in_dir]
+    tag_stream = zip(paths, read_tags(paths, workers))
+
+    for dirpath, audio_in_dir in audio_dirs:
         artists_count: Dict[str, int] = defaultdict(int)
         albums_count: Dict[str, int] = defaultdict(int)
         songs = []
         
         for f in audio_in_dir:
-            filepath = os.path.join(dirpath, f)
-            rel_path = os.path.relpath(filepath, root_dir)
+            filepath, t = next(tag_stream)
+            rel_path = filepath[root_prefix:]
             parsed = parse_layout(rel_path, layout)
-            t = get_all_tags(filepath)
             
             artist = t.artist or parsed.get("artist", "Unknown Artist")
             album = t.album or parsed.get("album", "Unknown Album")
@@ -67,7 +79,7 @@ def write_music_library_tree(root_dir: str, output_file: str, *, layout: str = "
     os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
 
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
             for artist in sorted(tree.keys()):
                 f.write(f"ARTIST: {artist}\n")
                 albums = sorted(tree[artist].keys())
@@ -82,29 +94,17 @@ def write_music_library_tree(root_dir: str, output_file: str, *, layout: str = "
                         if first_tag.genre:
                             genre_str = f" ({first_tag.genre})"
 
-                    f.write(f"  {connector} ALBUM: {album}{genre_str}\n")
+                    lines = [f"  {connector} ALBUM: {album}{genre_str}\n"]
 
                     for j, (song, song_path, t) in enumerate(songs):
-                        if t.title or t.artist:
-                            parts: List[str] = []
-                            if t.trackno:
-                                parts.append(f"{int(t.trackno):02d}.")
-                            if t.artist and t.artist != artist:
-                                parts.append(t.artist)
-                            if t.title:
-                                if t.artist and t.artist != artist:
-                                    parts.append("—")
-                                parts.append(t.title)
-                            display_name = " ".join(parts).strip()
-                        else:
-                            display_name = clean_song_name(song)
-
-                        ext = os.path.splitext(song)[1].lower().strip('.')
+                        display_name = _song_label(song, t, artist)
+                        ext = song.rpartition('.')[2].lower()
                         rating_str = format_rating(t.rating)
 
                         song_connector = "└──" if j == len(songs) - 1 else "├──"
-                        f.write(f"      {song_connector} SONG: {display_name} ({ext}){rating_str}\n")
-                    f.write("\n")
+                        lines.append(f"      {song_connector} SONG: {display_name} ({ext}){rating_str}\n")
+                    lines.append("\n")
+                    f.writelines(lines)
     except KeyboardInterrupt:
         if not quiet:
             print("\nInterrupted by user. Library scan cancelled.")
@@ -114,10 +114,13 @@ def write_music_library_tree(root_dir: str, output_file: str, *, layout: str = "
 # Mode: AI-readable library export
 # =====================================
 
-def write_ai_library(root_dir: str, output_file: str, *, layout: str = "{artist}/{album}", quiet: bool = False) -> None:
+def write_ai_library(root_dir: str, output_file: str, *, layout: str = "{artist}/{album}", quiet: bool = False,
+                     workers: int = DEFAULT_WORKERS) -> None:
     """Write a flat, token-efficient library summary for LLM consumption."""
     root_dir = os.path.abspath(root_dir)
-    total = count_audio_files(root_dir)
+    root_prefix = len(os.path.join(root_dir, ''))
+    audio_dirs = walk_audio_dirs(root_dir)
+    total = sum(len(audio_in_dir) for _, audio_in_dir in audio_dirs)
 
     if not quiet:
         print(f"Scanning {total} files under: {root_dir}")
@@ -127,22 +130,19 @@ def write_ai_library(root_dir: str, output_file: str, *, layout: str = "{artist}
     # directory -> {artist: str, album: str, genre: str, songs: list}
     albums_by_dir: Dict[str, Dict] = {}
 
-    for dirpath, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        audio_in_dir = [f for f in files if is_audio(f)]
-        if not audio_in_dir:
-            continue
-            
+    paths = [os.path.join(dirpath, f) for dirpath, audio_in_dir in audio_dirs for f in audio_in_dir]
+    tag_stream = zip(paths, read_tags(paths, workers))
+
+    for dirpath, audio_in_dir in audio_dirs:
         artists_count: Dict[str, int] = defaultdict(int)
         albums_count: Dict[str, int] = defaultdict(int)
         genres_count: Dict[str, int] = defaultdict(int)
         songs = []
 
         for f in audio_in_dir:
-            filepath = os.path.join(dirpath, f)
-            rel_path = os.path.relpath(filepath, root_dir)
+            filepath, t = next(tag_stream)
+            rel_path = filepath[root_prefix:]
             parsed = parse_layout(rel_path, layout)
-            t = get_all_tags(filepath)
             artist = t.artist or parsed.get("artist", "Unknown Artist")
             album = t.album or parsed.get("album", "Unknown Album")
             
@@ -194,8 +194,8 @@ def write_ai_library(root_dir: str, output_file: str, *, layout: str = "{artist}
     with open(out_path, "w", encoding="utf-8") as f:
         f.write("Artist | Album | Genre | Rating | Tracks\n")
         f.write("-" * 50 + "\n")
-        for artist, album, genre, rating, tracks in albums:
-            f.write(f"{artist} | {album} | {genre} | {rating} | {tracks}\n")
+        f.writelines([f"{artist} | {album} | {genre} | {rating} | {tracks}\n"
+                      for artist, album, genre, rating, tracks in albums])
 
     if not quiet:
         rated = sum(1 for _, _, _, r, _ in albums if r)
@@ -206,10 +206,12 @@ def write_ai_library(root_dir: str, output_file: str, *, layout: str = "{artist}
 # =====================================
 
 def write_all_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{album}", quiet: bool = False,
-                    show_genre: bool = False, show_paths: bool = False) -> int:
+                    show_genre: bool = False, show_paths: bool = False, workers: int = DEFAULT_WORKERS) -> int:
     """Generate a separate library tree file for each genre."""
     root_dir = os.path.abspath(root_dir)
-    total = count_audio_files(root_dir)
+    root_prefix = len(os.path.join(root_dir, ''))
+    audio_dirs = walk_audio_dirs(root_dir)
+    total = sum(len(audio_in_dir) for _, audio_in_dir in audio_dirs)
     if not quiet:
         print(f"Scanning {total} files for genre tags...")
 
@@ -218,22 +220,19 @@ def write_all_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{albu
     # directory -> {artist: str, album: str, genre: str, songs: list}
     albums_by_dir: Dict[str, Dict] = {}
 
-    for dirpath, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        audio_in_dir = [f for f in files if is_audio(f)]
-        if not audio_in_dir:
-            continue
-            
+    paths = [os.path.join(dirpath, f) for dirpath, audio_in_dir in audio_dirs for f in audio_in_dir]
+    tag_stream = zip(paths, read_tags(paths, workers))
+
+    for dirpath, audio_in_dir in audio_dirs:
         artists_count: Dict[str, int] = defaultdict(int)
         albums_count: Dict[str, int] = defaultdict(int)
         genres_count: Dict[str, int] = defaultdict(int)
         songs = []
         
         for f in audio_in_dir:
-            filepath = os.path.join(dirpath, f)
-            rel_path = os.path.relpath(filepath, root_dir)
+            filepath, t = next(tag_stream)
+            rel_path = filepath[root_prefix:]
             parsed = parse_layout(rel_path, layout)
-            t = get_all_tags(filepath)
             artist = t.artist or parsed.get("artist", "Unknown Artist")
             album = t.album or parsed.get("album", "Unknown Album")
             
@@ -282,14 +281,14 @@ def write_all_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{albu
 
     for genre_name in sorted(final_wings):
         artist_albums = final_wings[genre_name]
-        safe_name = re.sub(r'[^\w\s-]', '_', genre_name).strip().replace(' ', '_')
+        safe_name = _UNSAFE_NAME_CHARS.sub('_', genre_name).strip().replace(' ', '_')
         output = os.path.join(outdir, f"{safe_name}_Library.txt")
         album_count = sum(len(albums) for albums in artist_albums.values())
 
         if not quiet:
             print(f"→ {genre_name} ({album_count} albums)")
 
-        with open(output, 'w', encoding='utf-8') as f:
+        with open(output, 'w', encoding='utf-8', buffering=1 << 20) as f:
             for artist in sorted(artist_albums):
                 f.write(f"ARTIST: {artist}\n")
                 albums = sorted(artist_albums[artist])
@@ -306,28 +305,16 @@ def write_all_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{albu
                     
                     album_path = album_paths.get((artist, album), "")
                     path_str = f" [{album_path}]" if show_paths and album_path else ""
-                    f.write(f"  {connector} ALBUM: {album}{genre_str}{path_str}\n")
+                    lines = [f"  {connector} ALBUM: {album}{genre_str}{path_str}\n"]
 
                     for j, (song, song_path, t) in enumerate(songs):
-                        if t.title or t.artist:
-                            parts: List[str] = []
-                            if t.trackno:
-                                parts.append(f"{int(t.trackno):02d}.")
-                            if t.artist and t.artist != artist:
-                                parts.append(t.artist)
-                            if t.title:
-                                if t.artist and t.artist != artist:
-                                    parts.append("—")
-                                parts.append(t.title)
-                            display_name = " ".join(parts).strip()
-                        else:
-                            display_name = clean_song_name(song)
-
-                        ext = os.path.splitext(song)[1].lower().strip('.')
+                        display_name = _song_label(song, t, artist)
+                        ext = song.rpartition('.')[2].lower()
                         rating_str = format_rating(t.rating)
                         song_connector = "└──" if j == len(songs) - 1 else "├──"
-                        f.write(f"      {song_connector} SONG: {display_name} ({ext}){rating_str}\n")
-                    f.write("\n")
+                        lines.append(f"      {song_connector} SONG: {display_name} ({ext}){rating_str}\n")
+                    lines.append("\n")
+                    f.writelines(lines)
 
     if not quiet:
         total_albums = sum(sum(len(albums) for albums in artist_albums.values()) for artist_albums in final_wings.values())
@@ -338,10 +325,13 @@ def write_all_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{albu
 # Mode: AI wings (per-genre flat files)
 # =====================================
 
-def write_ai_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{album}", quiet: bool = False) -> int:
+def write_ai_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{album}", quiet: bool = False,
+                   workers: int = DEFAULT_WORKERS) -> int:
     """Generate separate, token-efficient AI library files for each genre."""
     root_dir = os.path.abspath(root_dir)
-    total = count_audio_files(root_dir)
+    root_prefix = len(os.path.join(root_dir, ''))
+    audio_dirs = walk_audio_dirs(root_dir)
+    total = sum(len(audio_in_dir) for _, audio_in_dir in audio_dirs)
     if not quiet:
         print(f"Scanning {total} files for AI wings...")
 
@@ -357,22 +347,22 @@ def write_ai_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{album
         "genres": defaultdict(int)
     })
 
-    for dirpath, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        for f in files:
-            if is_audio(f):
-                filepath = os.path.join(dirpath, f)
-                rel_path = os.path.relpath(filepath, root_dir)
-                parsed = parse_layout(rel_path, layout)
-                t = get_all_tags(filepath)
-                artist = t.artist or parsed.get("artist", "Unknown Artist")
-                album = t.album or parsed.get("album", "Unknown Album")
-                
-                album_data[dirpath]["artists"][artist] += 1
-                album_data[dirpath]["albums"][album] += 1
-                if t.genre:
-                    album_data[dirpath]["genres"][t.genre] += 1
-                pbar.update(1)
+    paths = [os.path.join(dirpath, f) for dirpath, audio_in_dir in audio_dirs for f in audio_in_dir]
+    tag_stream = zip(paths, read_tags(paths, workers))
+
+    for dirpath, audio_in_dir in audio_dirs:
+        for f in audio_in_dir:
+            filepath, t = next(tag_stream)
+            rel_path = filepath[root_prefix:]
+            parsed = parse_layout(rel_path, layout)
+            artist = t.artist or parsed.get("artist", "Unknown Artist")
+            album = t.album or parsed.get("album", "Unknown Album")
+            
+            album_data[dirpath]["artists"][artist] += 1
+            album_data[dirpath]["albums"][album] += 1
+            if t.genre:
+                album_data[dirpath]["genres"][t.genre] += 1
+            pbar.update(1)
 
     pbar.close()
     
@@ -401,7 +391,7 @@ def write_ai_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{album
 
     for genre_name in sorted(wings):
         albums = sorted(wings[genre_name])
-        safe_name = re.sub(r'[^\w\s-]', '_', genre_name).strip().replace(' ', '_')
+        safe_name = _UNSAFE_NAME_CHARS.sub('_', genre_name).strip().replace(' ', '_')
         output = os.path.join(outdir, f"{safe_name}_AI.txt")
 
         if not quiet:
@@ -410,8 +400,7 @@ def write_ai_wings(root_dir: str, outdir: str, *, layout: str = "{artist}/{album
         with open(output, 'w', encoding='utf-8') as f:
             f.write("Artist | Album | Genre | Location\n")
             f.write("-" * 60 + "\n")
-            for artist, album, genre, path in albums:
-                f.write(f"{artist} | {album} | {genre} | {path}\n")
+            f.writelines([f"{artist} | {album} | {genre} | {path}\n" for artist, album, genre, path in albums])
 
     if not quiet:
         total_albums = sum(len(a) for a in wings.values())
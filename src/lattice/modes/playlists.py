@@ -2,8 +2,9 @@ import os
 import sys
 from typing import List, Optional
 
-from lattice.utils import count_audio_files, _make_pbar, is_audio, parse_layout
-from lattice.tags import get_all_tags
+from lattice.utils import walk_audio_dirs, _make_pbar, parse_layout
+from lattice.tags import read_tags
+from lattice.config import DEFAULT_WORKERS
 
 # =====================================
 # Mode: Playlist generation (.m3u)
@@ -35,10 +36,13 @@ def _evaluate_rule(rule: str, t, parsed_layout: dict) -> bool:
         print(f"Error evaluating rule '{rule}': {e}", file=sys.stderr)
         return False
 
-def generate_playlist(root_dir: str, output_file: str, rule: str, layout: str = "{artist}/{album}", quiet: bool = False) -> int:
+def generate_playlist(root_dir: str, output_file: str, rule: str, layout: str = "{artist}/{album}", quiet: bool = False,
+                      workers: int = DEFAULT_WORKERS) -> int:
     """Generate an .m3u playlist based on a smart rule filter."""
     root_dir = os.path.abspath(root_dir)
-    total_files = count_audio_files(root_dir)
+    root_prefix = len(os.path.join(root_dir, ''))
+    audio_dirs = walk_audio_dirs(root_dir)
+    total_files = sum(len(audio_in_dir) for _, audio_in_dir in audio_dirs)
 
     if total_files == 0:
         if not quiet:
@@ -52,29 +56,28 @@ def generate_playlist(root_dir: str, output_file: str, rule: str, layout: str =
     
     playlist_entries: List[str] = []
 
-    for dirpath, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        
-        # Sort files to keep album tracks in order
-        for f in sorted(files):
-            if is_audio(f):
-                filepath = os.path.join(dirpath, f)
-                rel_path = os.path.relpath(filepath, root_dir)
-                parsed = parse_layout(rel_path, layout)
-                t = get_all_tags(filepath)
-                
-                if _evaluate_rule(rule, t, parsed):
-                    # For .m3u, we can write #EXTINF if we have duration and title
-                    duration = int(t.duration_s) if t.duration_s else -1
-                    artist = t.artist or parsed.get("artist", "Unknown")
-                    title = t.title or f
-                    display = f"{artist} - {title}" if artist != "Unknown" else title
-                    
-                    playlist_entries.append(f"#EXTINF:{duration},{display}")
-                    # Use absolute paths for the playlist
-                    playlist_entries.append(filepath)
+    paths = [os.path.join(dirpath, f) for dirpath, audio_in_dir in audio_dirs for f in audio_in_dir]
+    tag_stream = zip(paths, read_tags(paths, workers))
+
+    # walk_audio_dirs sorts filenames, which keeps album tracks in order
+    for dirpath, audio_in_dir in audio_dirs:
+        for f in audio_in_dir:
+            filepath, t = next(tag_stream)
+            rel_path = filepath[root_prefix:]
+            parsed = parse_layout(rel_path, layout)
+            
+            if _evaluate_rule(rule, t, parsed):
+                # For .m3u, we can write #EXTINF if we have duration and title
+                duration = int(t.duration_s) if t.duration_s else -1
+                artist = t.artist or parsed.get("artist", "Unknown")
+                title = t.title or f
+                display = f"{artist} - {title}" if artist != "Unknown" else title
                 
-                pbar.update(1)
+                playlist_entries.append(f"#EXTINF:{duration},{display}")
+                # Use absolute paths for the playlist
+                playlist_entries.append(filepath)
+            
+            pbar.update(1)
 
     pbar.close()
 
@@ -3,9 +3,9 @@ import sys
 from collections import Counter, defaultdict
 from typing import List, Optional, Dict
 
-from lattice.utils import count_audio_files, _make_pbar, is_audio
-from lattice.tags import get_all_tags
-from lattice.config import AUDIO_EXTENSIONS, DEFAULT_STATS_OUTPUT
+from lattice.utils import walk_audio_entries, _make_pbar
+from lattice.tags import read_tags
+from lattice.config import DEFAULT_STATS_OUTPUT, DEFAULT_WORKERS
 
 # =====================================
 # Mode: Library statistics
@@ -22,11 +22,12 @@ def _format_size(size_bytes: int) -> str:
     else:
         return f"{size_bytes / (1024 ** 3):.2f} GB"
 
-def run_stats(root: str, output: Optional[str], *, quiet: bool = False) -> str:
+def run_stats(root: str, output: Optional[str], *, quiet: bool = False, workers: int = DEFAULT_WORKERS) -> str:
     """Generate a library-wide statistics report."""
     root = os.path.abspath(root)
 
-    total_files = count_audio_files(root)
+    audio_dirs = walk_audio_entries(root)
+    total_files = sum(len(entries) for _, entries in audio_dirs)
     if total_files == 0:
         import lattice.utils as utils
         if not quiet and not utils.IN_TUI:
@@ -59,29 +60,27 @@ def run_stats(root: str, output: Optional[str], *, quiet: bool = False) -> str:
     bitrates: List[int] = []
     fully_tagged = 0  # has title + artist + track + genre
 
-    for dirpath, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
+    tag_stream = read_tags([entry.path for _, entries in audio_dirs for entry in entries], workers)
 
-        for f in sorted(files):
-            ext = os.path.splitext(f)[1].lower()
-            if ext not in AUDIO_EXTENSIONS:
-                continue
+    for dirpath, entries in audio_dirs:
+        # Artist/album tracking from directory structure
+        rel = os.path.relpath(dirpath, root)
+        parts = rel.split(os.sep)
 
-            filepath = os.path.join(dirpath, f)
+        for entry in entries:
+            # The walk only returns names ending in an audio suffix
+            ext = entry.name[entry.name.rfind('.'):].lower()
             format_counts[ext] += 1
 
             try:
-                fsize = os.path.getsize(filepath)
+                fsize = entry.stat().st_size
                 total_size += fsize
                 format_sizes[ext] += fsize
             except OSError:
                 fsize = 0
 
-            t = get_all_tags(filepath)
+            t = next(tag_stream)
 
-            # Artist/album tracking from directory structure
-            rel = os.path.relpath(dirpath, root)
-            parts = rel.split(os.sep)
             if len(parts) >= 1:
                 artist_dirs.add(parts[0])
             if len(parts) >= 2:
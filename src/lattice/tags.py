@@ -1,5 +1,9 @@
 import os
-from typing import NamedTuple, Optional
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional
 
 from lattice.utils import normalize_rating, _looks_numeric
 
@@ -34,15 +38,27 @@ except ImportError:
 
 try:
     from mutagen.mp3 import MP3 as MUTAGEN_MP3
+    from mutagen.id3 import Frames as _ID3_FRAMES, Frames_2_2 as _ID3_FRAMES_2_2
     HAVE_MUTAGEN_MP3 = True
 except ImportError:
     HAVE_MUTAGEN_MP3 = False
 
+_VORBIS_FIELDS = frozenset({'title', 'artist', 'albumartist', 'tracknumber', 'album', 'genre'})
+_ASF_FIELDS = frozenset({'title', 'wm/albumartist', 'author', 'wm/tracknumber', 'tracknumber',
+                         'wm/albumtitle', 'album', 'wm/genre', 'genre'})
+
+# Windows Media Player writes its own 1-5 star steps as POPM byte values
+_WMP_POPM_MAP = {1: 1.0, 64: 2.0, 128: 3.0, 196: 4.0, 255: 5.0}
+
 def _first_text(val) -> Optional[str]:
     if val is None:
         return None
     if isinstance(val, (list, tuple)):
         val = val[0] if val else None
+    # Plain strings (Vorbis/ID3 text values) need none of the probes below
+    if type(val) is str:
+        s = val.replace('\x00', '/').strip()
+        return s if s else None
         
     # Handle Mutagen ID3 frames which store strings in a .text list
     if hasattr(val, "text") and isinstance(val.text, list) and val.text:
@@ -81,6 +97,170 @@ def _parse_track_number(val) -> Optional[int]:
     except ValueError:
         return None
 
+def _read_id3(tags):
+    title = artist = album = genre = None
+    trackno = rating = None
+    if hasattr(tags, 'get'):
+        tit2 = tags.get('TIT2')
+        if tit2:
+            title = _first_text(tit2.text)
+        tpe1 = tags.get('TPE1')
+        tpe2 = tags.get('TPE2')
+        if tpe2:
+            artist = _first_text(tpe2.text)
+        elif tpe1:
+            artist = _first_text(tpe1.text)
+        trck = tags.get('TRCK')
+        if trck:
+            trackno = _parse_track_number(trck.text)
+        talb = tags.get('TALB')
+        if talb:
+            album = _first_text(talb.text)
+
+    if hasattr(tags, 'getall'):
+        tcon = tags.getall('TCON')
+        if tcon:
+            genre = _first_text(tcon[0])
+
+        # Rating: POPM (prefer WMP, then first non-zero) / TXXX
+        wmp = fallback = None
+        for popm in tags.getall('POPM'):
+            if getattr(popm, 'email', '') == 'Windows Media Player 9 Series':
+                wmp = popm
+                break
+            if fallback is None and popm.rating > 0:
+                fallback = popm
+        if wmp is not None:
+            rating = _WMP_POPM_MAP.get(wmp.rating, normalize_rating(wmp.rating))
+        elif fallback is not None:
+            rating = normalize_rating(fallback.rating)
+        if rating is None:
+            for txxx in tags.getall('TXXX'):
+                desc = (txxx.desc or "").lower()
+                if 'rating' in desc or desc in ('rate', 'score', 'stars'):
+                    val = txxx.text[0] if txxx.text else None
+                    if _looks_numeric(val):
+                        rating = normalize_rating(val)
+                        break
+    return title, artist, trackno, album, genre, rating
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_mp4_rating_key(key) -> bool:
+    kl = str(key).lower()
+    return 'rate' in kl or 'rating' in kl
+
+
+def _read_mp4(tags):
+    title = _first_text(tags.get('\xa9nam'))
+    artist = _first_text(tags.get('aART')) or _first_text(tags.get('\xa9ART'))
+    trackno = _parse_track_number(tags.get('trkn'))
+    album = _first_text(tags.get('\xa9alb'))
+    genre = rating = None
+    for k in ('\xa9gen', 'gnre'):
+        v = tags.get(k)
+        if v:
+            genre = _first_text(v)
+            break
+    for k, v in tags.items():
+        if _is_mp4_rating_key(k):
+            v = v[0] if isinstance(v, list) else v
+            if _looks_numeric(v):
+                rating = normalize_rating(v)
+                break
+    return title, artist, trackno, album, genre, rating
+
+
+def _key_classifier(wanted: frozenset, is_rating_key):
+    """Build a cached classify(key) -> (lowercased key, is it a rating key)."""
+    @functools.lru_cache(maxsize=1024)
+    def classify(key: str):
+        kl = key.lower()
+        return kl, kl not in wanted and is_rating_key(kl)
+    return classify
+
+
+_classify_vorbis_key = _key_classifier(
+    _VORBIS_FIELDS, lambda kl: 'rating' in kl or 'score' in kl or 'stars' in kl)
+_classify_asf_key = _key_classifier(_ASF_FIELDS, lambda kl: 'rating' in kl)
+
+
+def _scan_fields(tags, wanted: frozenset, classify):
+    """One pass over a flat (key, value) tag list.
+
+    Returns the first value of each wanted field and the rating from the
+    first rating-like key whose first value is numeric.
+    """
+    fields = {}
+    rating = None
+    seen_rating_keys = set()
+    for key, val in tags:
+        kl, is_rating = classify(key)
+        if kl in wanted:
+            if kl not in fields:
+                fields[kl] = val
+        elif is_rating and rating is None and kl not in seen_rating_keys:
+            seen_rating_keys.add(kl)
+            # ASF attributes wrap their payload; Vorbis values are plain str
+            val = getattr(val, 'value', val)
+            if _looks_numeric(val):
+                rating = normalize_rating(val)
+    return fields, rating
+
+
+def _read_vorbis(tags):
+    # VComment is a flat list of (key, value) pairs and every keyed
+    # lookup rescans it, so collect everything in one pass instead.
+    fields, rating = _scan_fields(tags, _VORBIS_FIELDS, _classify_vorbis_key)
+    return (_first_text(fields.get('title')),
+            _first_text(fields.get('albumartist') or fields.get('artist')),
+            _parse_track_number(fields.get('tracknumber')),
+            _first_text(fields.get('album')),
+            _first_text(fields.get('genre')),
+            rating)
+
+
+def _read_asf(tags):
+    fields, rating = _scan_fields(tags, _ASF_FIELDS, _classify_asf_key)
+    return (_first_text(fields.get('title')),
+            _first_text(fields.get('wm/albumartist') or fields.get('author')),
+            _parse_track_number(fields.get('wm/tracknumber') or fields.get('tracknumber')),
+            _first_text(fields.get('wm/albumtitle')) or _first_text(fields.get('album')),
+            _first_text(fields.get('wm/genre')) or _first_text(fields.get('genre')),
+            rating)
+
+
+def _open_by_ext():
+    """Format class per extension, so get_all_tags can skip MutagenFile's probing."""
+    openers = {}
+    if HAVE_MUTAGEN_BASE:
+        openers.update({'.flac': FLAC, '.ogg': OggVorbis, '.m4a': MP4, '.wma': ASF})
+        if hasattr(OggOpus, 'load'):
+            openers['.opus'] = OggOpus
+    if HAVE_MUTAGEN_MP3:
+        # Only parse the ID3 frames _read_id3 looks at (plus their v2.2
+        # names); APIC, lyrics, PRIV etc. stay unparsed raw frames.
+        known = {fid: _ID3_FRAMES[fid] for fid in
+                 ('TIT2', 'TPE1', 'TPE2', 'TRCK', 'TALB', 'TCON', 'POPM', 'TXXX')}
+        known.update({fid: _ID3_FRAMES_2_2[fid] for fid in
+                      ('TT2', 'TP1', 'TP2', 'TRK', 'TAL', 'TCO', 'POP', 'TXX')})
+        openers['.mp3'] = lambda path: MUTAGEN_MP3(path, known_frames=known)
+    return openers
+
+_OPENERS = _open_by_ext()
+
+
+# Per-extension tag readers; anything else goes through the generic fallback
+_TAG_READERS = {
+    '.mp3': _read_id3,
+    '.m4a': _read_mp4,
+    '.flac': _read_vorbis,
+    '.ogg': _read_vorbis,
+    '.opus': _read_vorbis,
+    '.wma': _read_asf,
+}
+
+
 def get_all_tags(file_path: str) -> TagBundle:
     """Extract all metadata in a single file open."""
     if not HAVE_MUTAGEN_BASE:
@@ -92,8 +272,18 @@ def get_all_tags(file_path: str) -> TagBundle:
     duration_s: Optional[float] = None
     bitrate_kbps: Optional[int] = None
 
+    ext = os.path.splitext(file_path)[1].lower()
     try:
-        audio = MutagenFile(file_path)
+        audio = None
+        opener = _OPENERS.get(ext)
+        if opener:
+            try:
+                audio = opener(file_path)
+            except Exception:
+                # Misnamed or unusual container (e.g. FLAC-in-Ogg): let mutagen probe it
+                pass
+        if audio is None:
+            audio = MutagenFile(file_path)
         if not audio:
             return TagBundle()
 
@@ -107,132 +297,57 @@ def get_all_tags(file_path: str) -> TagBundle:
             if br > 0:
                 bitrate_kbps = int(br / 1000)
 
-        ext = os.path.splitext(file_path)[1].lower()
         tags = getattr(audio, 'tags', {}) or {}
+        if not tags:
+            return TagBundle(duration_s=duration_s, bitrate_kbps=bitrate_kbps)
 
-        if ext == '.mp3':
-            # ID3 tags — accessible via audio.tags from MutagenFile
-            if not tags:
-                return TagBundle(title, artist, trackno, album, genre, rating,
-                                 duration_s, bitrate_kbps)
-
-            if hasattr(tags, 'get'):
-                tit2 = tags.get('TIT2')
-                if tit2:
-                    title = _first_text(tit2.text)
-                tpe1 = tags.get('TPE1')
-                tpe2 = tags.get('TPE2')
-                if tpe2:
-                    artist = _first_text(tpe2.text)
-                elif tpe1:
-                    artist = _first_text(tpe1.text)
-                trck = tags.get('TRCK')
-                if trck:
-                    trackno = _parse_track_number(trck.text)
-                talb = tags.get('TALB')
-                if talb:
-                    album = _first_text(talb.text)
-
-            if hasattr(tags, 'getall'):
-                tcon = tags.getall('TCON')
-                if tcon:
-                    genre = _first_text(tcon[0])
-
-                # Rating: POPM (prefer WMP, then any) / TXXX
-                for popm in tags.getall('POPM'):
-                    if getattr(popm, 'email', '') == 'Windows Media Player 9 Series':
-                        wmp_map = {1: 1.0, 64: 2.0, 128: 3.0, 196: 4.0, 255: 5.0}
-                        rating = wmp_map.get(popm.rating, normalize_rating(popm.rating))
-                        break
-                if rating is None:
-                    for popm in tags.getall('POPM'):
-                        if popm.rating > 0:
-                            rating = normalize_rating(popm.rating)
-                            break
-                if rating is None:
-                    for txxx in tags.getall('TXXX'):
-                        desc = (txxx.desc or "").lower()
-                        if 'rating' in desc or desc in ('rate', 'score', 'stars'):
-                            val = txxx.text[0] if txxx.text else None
-                            if _looks_numeric(val):
-                                rating = normalize_rating(val)
-                                break
-
-        elif isinstance(audio, MP4):
-            title = _first_text(tags.get('\xa9nam'))
-            artist = _first_text(tags.get('aART')) or _first_text(tags.get('\xa9ART'))
-            trackno = _parse_track_number(tags.get('trkn'))
-            album = _first_text(tags.get('\xa9alb'))
-            for k in ('\xa9gen', 'gnre'):
-                v = tags.get(k)
-                if v:
-                    genre = _first_text(v)
-                    break
-            for k, v in tags.items():
-                kl = k.lower() if isinstance(k, str) else str(k).lower()
-                if 'rate' in kl or 'rating' in kl:
-                    v = v[0] if isinstance(v, list) else v
-                    if _looks_numeric(v):
-                        rating = normalize_rating(v)
-                        break
-
-        elif isinstance(audio, (FLAC, OggVorbis, OggOpus)):
-            keys = {k.lower(): k for k in tags.keys()}
-            if 'title' in keys:
-                title = _first_text(tags[keys['title']])
-            if 'albumartist' in keys:
-                artist = _first_text(tags[keys['albumartist']])
-            elif 'artist' in keys:
-                artist = _first_text(tags[keys['artist']])
-            if 'tracknumber' in keys:
-                trackno = _parse_track_number(tags[keys['tracknumber']])
-            if 'album' in keys:
-                album = _first_text(tags[keys['album']])
-            if 'genre' in keys:
-                genre = _first_text(tags[keys['genre']])
-            for key, val in tags.items():
-                if 'rating' in key.lower() or 'score' in key.lower() or 'stars' in key.lower():
-                    val = val[0] if isinstance(val, list) else val
-                    if _looks_numeric(val):
-                        rating = normalize_rating(val)
-                        break
-
-        elif isinstance(audio, ASF):
-            name_map = {k_name.lower(): k_name for k_name in tags.keys()}
-            if (key_name := name_map.get('title')):
-                title = _first_text(tags.get(key_name))
-            if (key_name := name_map.get('wm/albumartist') or name_map.get('author')):
-                artist = _first_text(tags.get(key_name))
-            if (key_name := name_map.get('wm/tracknumber') or name_map.get('tracknumber')):
-                trackno = _parse_track_number(tags.get(key_name))
-            if (key_name := name_map.get('wm/albumtitle')):
-                album = _first_text(tags.get(key_name))
-            if (key_name := name_map.get('wm/genre')):
-                genre = _first_text(tags.get(key_name))
-            for key, val in tags.items():
-                if 'rating' in key.lower():
-                    val = val[0] if isinstance(val, list) else val
-                    if _looks_numeric(val):
-                        rating = normalize_rating(val)
-                        break
+        reader = _TAG_READERS.get(ext)
+        if reader:
+            try:
+                return TagBundle(*reader(tags), duration_s, bitrate_kbps)
+            except Exception:
+                # Misnamed file (e.g. ID3 inside a .flac): use the generic scan
+                pass
 
-        # Fallback: generic tag iteration for album/genre if still missing
-        if album is None or genre is None:
-            for k, v in tags.items():
-                kl = str(k).lower()
-                if album is None and kl == 'album':
-                    album = _first_text(v)
-                if genre is None and kl in ('genre', 'wm/genre'):
-                    genre = _first_text(v)
-            if album is None:
-                getall_fn = getattr(tags, 'getall', None)
-                if getall_fn:
-                    talb = getall_fn('TALB')
-                    if talb:
-                        album = _first_text(talb[0])
+        # Generic album/genre scan for formats without a dedicated reader
+        for k, v in tags.items():
+            kl = str(k).lower()
+            if album is None and kl == 'album':
+                album = _first_text(v)
+            if genre is None and kl in ('genre', 'wm/genre'):
+                genre = _first_text(v)
+        if album is None:
+            getall_fn = getattr(tags, 'getall', None)
+            if getall_fn:
+                talb = getall_fn('TALB')
+                if talb:
+                    album = _first_text(talb[0])
 
     except Exception:
         pass
 
     return TagBundle(title, artist, trackno, album, genre, rating,
                      duration_s, bitrate_kbps)
+
+
+def read_tags(paths: Iterable[str], workers: int = 1) -> Iterator[TagBundle]:
+    """Yield get_all_tags() for each path, in input order, using a thread pool.
+
+    Tag reads are dominated by file I/O, which releases the GIL, so a few
+    threads overlap disk latency across files. At most 4 x workers reads
+    are queued at once, so memory stays flat however many paths are given.
+    """
+    if workers <= 1:
+        yield from map(get_all_tags, paths)
+        return
+    it = iter(paths)
+    ex = ThreadPoolExecutor(max_workers=workers)
+    try:
+        window = deque(ex.submit(get_all_tags, p) for p in islice(it, workers * 4))
+        while window:
+            fut = window.popleft()
+            for p in islice(it, 1):
+                window.append(ex.submit(get_all_tags, p))
+            yield fut.result()
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
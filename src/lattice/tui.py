@@ -24,6 +24,7 @@ from lattice.config import (
     DEFAULT_TAG_AUDIT_OUTPUT,
     DEFAULT_BITRATE_AUDIT_OUTPUT,
     DEFAULT_PLAYLIST_OUTPUT,
+    DEFAULT_WORKERS,
 )
 
 from lattice.modes.library import write_music_library_tree, write_ai_library, write_all_wings, write_ai_wings
@@ -556,16 +557,18 @@ def _library_submenu(root: str) -> None:
             output = _prompt_str("Output file", DEFAULT_LIBRARY_OUTPUT) or DEFAULT_LIBRARY_OUTPUT
             layout = _prompt_str("Path extraction layout", "{artist}/{album}") or "{artist}/{album}"
             show_g = _prompt_str("Include genres? (y/N)", "N").lower().startswith('y')
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             def _wrap():
-                write_music_library_tree(root, output, layout=layout, quiet=False, show_genre=show_g)
+                write_music_library_tree(root, output, layout=layout, quiet=False, show_genre=show_g, workers=workers)
                 print(f"\n  Library written to {output}")
             _run_with_capture("Build music library tree", _wrap)
 
         elif result == (0, 1):
             output = _prompt_str("Output file", DEFAULT_AI_LIBRARY_OUTPUT) or DEFAULT_AI_LIBRARY_OUTPUT
             layout = _prompt_str("Path extraction layout", "{artist}/{album}") or "{artist}/{album}"
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             def _wrap2():
-                write_ai_library(root, output, layout=layout, quiet=False)
+                write_ai_library(root, output, layout=layout, quiet=False, workers=workers)
                 print(f"\n  Library written to {output}")
             _run_with_capture("AI-readable library export", _wrap2)
 
@@ -574,16 +577,19 @@ def _library_submenu(root: str) -> None:
             layout = _prompt_str("Path extraction layout", "{artist}/{album}") or "{artist}/{album}"
             show_g = _prompt_str("Include genres? (y/N)", "N").lower().startswith('y')
             show_p = _prompt_str("Include paths? (y/N)", "N").lower().startswith('y')
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             def _wrap3():
-                write_all_wings(root, outdir, layout=layout, quiet=False, show_genre=show_g, show_paths=show_p)
+                write_all_wings(root, outdir, layout=layout, quiet=False, show_genre=show_g, show_paths=show_p,
+                                workers=workers)
                 print(f"\n  Wings generated in {outdir}")
             _run_with_capture("Generate all wings (per-genre)", _wrap3)
 
         elif result == (0, 3):
             outdir = _prompt_str("Output directory", "wings_ai") or "wings_ai"
             layout = _prompt_str("Path extraction layout", "{artist}/{album}") or "{artist}/{album}"
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             def _wrap_ai():
-                write_ai_wings(root, outdir, layout=layout, quiet=False)
+                write_ai_wings(root, outdir, layout=layout, quiet=False, workers=workers)
                 print(f"\n  AI Wings generated in {outdir}")
             _run_with_capture("Generate AI wings (per-genre flat)", _wrap_ai)
 
@@ -591,8 +597,9 @@ def _library_submenu(root: str) -> None:
             output = _prompt_str("Output file", DEFAULT_PLAYLIST_OUTPUT) or DEFAULT_PLAYLIST_OUTPUT
             rule = _prompt_str("Smart rule (e.g. \"rating >= 4 and genre == 'Jazz'\")", "")
             layout = _prompt_str("Path extraction layout", "{artist}/{album}") or "{artist}/{album}"
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             def _wrap4():
-                generate_playlist(root, output, rule, layout=layout, quiet=False)
+                generate_playlist(root, output, rule, layout=layout, quiet=False, workers=workers)
             _run_with_capture("Generate smart playlist", _wrap4)
 
 def interactive_menu() -> int:
@@ -628,38 +635,43 @@ def interactive_menu() -> int:
 
         elif result == (0, 1):
             output = _prompt_str("Output file (leave blank for screen)", "").strip() or None
-            _run_with_capture("Library Statistics", run_stats, root, output, quiet=False)
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
+            _run_with_capture("Library Statistics", run_stats, root, output, quiet=False, workers=workers)
 
         elif result == (1, 0):
             output = _prompt_str("Output file", DEFAULT_FLAC_OUTPUT) or DEFAULT_FLAC_OUTPUT
-            workers = _prompt_int("Workers", 4)
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             pref = _prompt_str("Preferred tool (flac/ffmpeg)", "flac").lower()
-            _run_with_capture("Test FLAC files", run_flac_mode, root, output, workers, pref, quiet=False)
+            fast = _prompt_str("Structure check only, skip decode? (y/N)", "N").lower().startswith('y')
+            skip_v = not fast and _prompt_str("Skip files verified on a previous run? (y/N)", "N").lower().startswith('y')
+            largest = not fast and _prompt_str("Check largest files first? (y/N)", "N").lower().startswith('y')
+            _run_with_capture("Test FLAC files", run_flac_mode, root, output, workers, pref, quiet=False, fast=fast,
+                              skip_verified=skip_v, largest_first=largest)
 
         elif result == (1, 1):
             output = _prompt_str("Output file", DEFAULT_MP3_OUTPUT) or DEFAULT_MP3_OUTPUT
-            workers = _prompt_int("Workers", 4)
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             include_ok = _prompt_str("Include OK rows? (y/N)", "N").lower().startswith('y')
             _run_with_capture("Test MP3 files", run_mp3_mode, root, output, workers, None,
                 only_errors=not include_ok, verbose=include_ok, quiet=False)
 
         elif result == (1, 2):
             output = _prompt_str("Output file", DEFAULT_OPUS_OUTPUT) or DEFAULT_OPUS_OUTPUT
-            workers = _prompt_int("Workers", 4)
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             include_ok = _prompt_str("Include OK rows? (y/N)", "N").lower().startswith('y')
             _run_with_capture("Test Opus files", run_opus_mode, root, output, workers, None,
                 only_errors=not include_ok, verbose=include_ok, quiet=False)
 
         elif result == (1, 3):
             output = _prompt_str("Output file", DEFAULT_WAV_OUTPUT) or DEFAULT_WAV_OUTPUT
-            workers = _prompt_int("Workers", 4)
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             include_ok = _prompt_str("Include OK rows? (y/N)", "N").lower().startswith('y')
             _run_with_capture("Test WAV files", run_wav_mode, root, output, workers, None,
                 only_errors=not include_ok, verbose=include_ok, quiet=False)
 
         elif result == (1, 4):
             output = _prompt_str("Output file", DEFAULT_WMA_OUTPUT) or DEFAULT_WMA_OUTPUT
-            workers = _prompt_int("Workers", 4)
+            workers = _prompt_int("Workers", DEFAULT_WORKERS)
             include_ok = _prompt_str("Include OK rows? (y/N)", "N").lower().startswith('y')
             _run_with_capture("Test WMA files", run_wma_mode, root, output, workers, None,
                 only_errors=not include_ok, verbose=include_ok, quiet=False)
@@ -1,10 +1,15 @@
 import os
 import sys
+import bisect
 import shutil
+import signal
+import functools
 import subprocess
-from typing import Tuple, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator, Tuple, List, Optional
 
-from lattice.config import AUDIO_EXTENSIONS, COVER_NAMES, RE_CLEAN_PREFIX, RE_CLEAN_PATTERNS
+from lattice.config import AUDIO_EXTENSIONS, COVER_NAMES
 
 try:
     from tqdm import tqdm
@@ -14,9 +19,13 @@ except ImportError:
 
 IN_TUI = False
 
+_AUDIO_SUFFIXES = tuple(AUDIO_EXTENSIONS)
+# Suffix tests only lowercase this many trailing characters, not the whole name
+_AUDIO_TAIL = -max(map(len, _AUDIO_SUFFIXES))
+
 def is_audio(filename: str) -> bool:
-    """Check if a filename has a recognized audio extension."""
-    return os.path.splitext(filename)[1].lower() in AUDIO_EXTENSIONS
+    """Check if a filename has a recognized audio extension (and a non-empty stem)."""
+    return filename[_AUDIO_TAIL:].lower().endswith(_AUDIO_SUFFIXES) and filename.rfind('.') > 0
 
 def _reset_terminal() -> None:
     """Restore sane terminal state after subprocess runs.
@@ -33,43 +42,106 @@ def _reset_terminal() -> None:
         pass
 
 
-def clean_song_name(filename: str) -> str:
-    name_without_ext = os.path.splitext(filename)[0]
-    name_without_ext = RE_CLEAN_PREFIX.sub('', name_without_ext)
-    for pattern in RE_CLEAN_PATTERNS:
-        match = pattern.match(name_without_ext.strip())
-        if match:
-            track_num = match.group(1).zfill(2)
-            title = match.group(2).strip()
-            return f"{track_num}. {title}"
-    return name_without_ext.strip()
+_TRACK_DASHES = "-–—"
+
+
+def _skip_spaces(s: str, i: int) -> int:
+    while i < len(s) and s[i].isspace():
+        i += 1
+    return i
+
+
+def _skip_digits(s: str, i: int) -> int:
+    while i < len(s) and s[i].isdecimal():
+        i += 1
+    return i
+
 
+def _split_track_title(s: str, i: int) -> Optional[Tuple[str, str]]:
+    """Parse `NN[.] [-] Title` starting at s[i] into (track digits, title)."""
+    j = _skip_digits(s, i)
+    if j == i:
+        return None
+    k = j + 1 if s[j:j + 1] == "." else j
+    k = _skip_spaces(s, k)
+    if s[k:k + 1] in _TRACK_DASHES and k < len(s):
+        k += 1
+    title = s[k:].strip()
+    return (s[i:j], title) if title else None
 
+
+def clean_song_name(filename: str) -> str:
+    """Turn a filename like `Artist - 1-03. Title.flac` into `03. Title`.
+
+    Single left-to-right scan: drop an `Artist - ` prefix (no digits before
+    the first hyphen), skip an optional `D - ` disc prefix, then split the
+    track digits from the title. Unparseable names are returned stripped.
+    """
+    name = os.path.splitext(filename)[0]
+    i = 0
+    while i < len(name) and name[i] != "-" and not name[i].isdecimal():
+        i += 1
+    if i < len(name) and name[i] == "-":
+        name = name[i + 1:]
+    name = name.strip()
+
+    parsed = None
+    if name[:1].isdecimal():
+        k = _skip_spaces(name, _skip_digits(name, 0))
+        if name[k:k + 1] in _TRACK_DASHES and k < len(name):
+            parsed = _split_track_title(name, _skip_spaces(name, k + 1))
+        parsed = parsed or _split_track_title(name, 0)
+    elif name.startswith(("Track", "track")):
+        parsed = _split_track_title(name, _skip_spaces(name, 5))
+
+    if parsed:
+        track_num, title = parsed
+        return f"{track_num.zfill(2)}. {title}"
+    return name
+
+
+# Upper bound of each rating scale (0-5, 0-10, 0-100, POPM 0-255) and the
+# divisor that maps it onto 0-5
+_RATING_SCALE_MAX = (5.0, 10.0, 100.0, 255.0)
+_RATING_SCALE_DIV = (1.0, 2.0, 20.0, 51.0)
+
+
+@functools.lru_cache(maxsize=256)
 def normalize_rating(val) -> Optional[float]:
     """Normalizes various rating scales (0-100, 0-255, 0-5) to a float 0-5."""
     try:
         val = float(val)
-        if val <= 5:
-            return val
-        elif val <= 10:
-            return val / 2.0
-        elif val <= 100:
-            return val / 20.0
-        elif val <= 255:
-            return (val / 255.0) * 5.0
     except (ValueError, TypeError):
-        pass
-    return None
+        return None
+    scale = bisect.bisect_left(_RATING_SCALE_MAX, val)
+    if scale == len(_RATING_SCALE_MAX) or val != val:  # above 255, or NaN
+        return None
+    return val / _RATING_SCALE_DIV[scale]
 
 
 def _looks_numeric(val) -> bool:
-    """Check if a value looks like a number (int or float)."""
-    return bool(val) and str(val).replace('.', '').isdigit()
+    """Check if a value looks like a number (digits with at most one '.')."""
+    if not val:
+        return False
+    s = str(val)
+    if s.isdigit():
+        return True
+    head, dot, tail = s.partition('.')
+    if not dot or not (head or tail):
+        return False
+    return (not head or head.isdigit()) and (not tail or tail.isdigit())
+
+
+# A half star is drawn with the same glyph as an empty one, so every
+# in-range rating renders as one of six fixed strings
+_STAR_BARS = tuple("★" * i + "☆" * (5 - i) for i in range(6))
 
 
 def format_rating(rating: Optional[float]) -> str:
     if rating is None:
         return ""
+    if 0 <= rating <= 5:
+        return f" [{_STAR_BARS[int(rating)]} {rating:.1f}/5]"
     full_stars = int(rating)
     half_star = rating - full_stars >= 0.5
     empty_stars = 5 - full_stars - (1 if half_star else 0)
@@ -80,55 +152,214 @@ def format_rating(rating: Optional[float]) -> str:
     return f" [{stars} {rating:.1f}/5]"
 
 
+_PROGRESS_INTERVAL = 0.05
+_BAR_LEN = 40
+# Filled and empty cells back to back: any bar is a fixed-width slice
+_BAR_CELLS = '█' * _BAR_LEN + '░' * _BAR_LEN
+
+
 def update_progress(current: int, total: int, prefix: str = "Progress") -> None:
     if total == 0:
         return
     percent = (current / total) * 100
-    bar_length = 40
-    filled_length = int(bar_length * current // total)
-    bar = '█' * filled_length + '░' * (bar_length - filled_length)
-    sys.stdout.write(f'\r{prefix}: |{bar}| {current}/{total} ({percent:.1f}%)')
-    sys.stdout.flush()
+    filled = _BAR_LEN * current // total
+    bar = _BAR_CELLS[_BAR_LEN - filled:2 * _BAR_LEN - filled]
+    line = f'\r{prefix}: |{bar}| {current}/{total} ({percent:.1f}%)'
     if current == total:
-        print()
+        line += '\n'
+    out = getattr(sys.stdout, 'buffer', None)
+    if out is not None:
+        sys.stdout.flush()
+        out.write(line.encode(sys.stdout.encoding or 'utf-8', errors='replace'))
+        out.flush()
+    else:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+def _scan_dir(path: str, suffixes: Tuple[str, ...]) -> Tuple[List[str], List[str]]:
+    """List one directory: (subdirectory paths, paths of files matching suffixes).
+
+    A name that is only the suffix (".flac") has no stem and is skipped,
+    as os.path.splitext would treat it.
+    """
+    subdirs: List[str] = []
+    files: List[str] = []
+    tail = -max(map(len, suffixes))
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name[tail:].lower().endswith(suffixes) and entry.name.rfind('.') > 0:
+                    files.append(entry.path)
+    except OSError:
+        pass
+    return subdirs, files
 
 
-def count_audio_files(root_dir: str) -> int:
-    total = 0
-    for _, _, files in os.walk(root_dir):
-        total += sum(1 for f in files if is_audio(f))
-    return total
+def _iter_files(root_dir: str, suffixes: Tuple[str, ...], workers: int = 1) -> Iterator[str]:
+    """Yield paths under root_dir whose lowercased name ends with one of suffixes.
+
+    Uses os.scandir so directory checks reuse the d_type from the listing
+    instead of issuing a separate stat per entry. With workers > 1, sibling
+    directories are listed concurrently, which hides per-directory latency
+    on network shares; yield order is then unspecified.
+    """
+    if workers <= 1:
+        stack = [root_dir]
+        while stack:
+            subdirs, files = _scan_dir(stack.pop(), suffixes)
+            stack.extend(subdirs)
+            yield from files
+        return
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending = {ex.submit(_scan_dir, root_dir, suffixes)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                subdirs, files = fut.result()
+                pending.update(ex.submit(_scan_dir, d, suffixes) for d in subdirs)
+                yield from files
+
+
+def walk_audio_entries(root_dir: str) -> List[Tuple[str, List[os.DirEntry]]]:
+    """Collect (dirpath, audio DirEntries sorted by name) for every non-hidden directory with audio.
+
+    Directories come back top-down in name order. Entries keep the type
+    info from the listing, and entry.stat() is cached per entry (free on
+    Windows), so callers needing sizes don't stat each path again.
+    """
+    found: List[Tuple[str, List[os.DirEntry]]] = []
+    stack = [root_dir]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        audio_in_dir = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.name.startswith('.'):
+                    subdirs.append(entry.path)
+            elif entry.name[_AUDIO_TAIL:].lower().endswith(_AUDIO_SUFFIXES) and entry.name.rfind('.') > 0:
+                audio_in_dir.append(entry)
+        if audio_in_dir:
+            found.append((dirpath, audio_in_dir))
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def walk_audio_dirs(root_dir: str) -> List[Tuple[str, List[str]]]:
+    """Collect (dirpath, sorted audio filenames) for every non-hidden directory with audio.
+
+    One walk serves both the progress total and the scan itself.
+    """
+    return [(dirpath, [e.name for e in entries]) for dirpath, entries in walk_audio_entries(root_dir)]
 
 
 def _decode_bytes(b: bytes) -> str:
-    for enc in ("utf-8", "mbcs", "latin-1"):
+    # Tools run with a UTF-8 locale (see _proc_env), so one lenient decode
+    # normally suffices; Windows builds of flac may still emit the ANSI code page.
+    if not b:
+        return ""  # the usual case: a clean file leaves stderr empty
+    text = b.decode("utf-8", errors="replace")
+    if sys.platform == "win32" and "\ufffd" in text:
         try:
-            return b.decode(enc, errors="strict")
-        except (UnicodeDecodeError, LookupError):
-            continue
-    return b.decode("latin-1", errors="replace")
+            return b.decode("mbcs")
+        except UnicodeDecodeError:
+            pass
+    return text
 
 
-def run_proc(args: List[str]) -> Tuple[int, str, str]:
+# Windows: don't allocate a console for every flac/ffmpeg child (0 elsewhere)
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+@functools.lru_cache(maxsize=1)
+def _proc_env() -> dict:
+    """Child environment, built once; callers must not mutate it."""
     env = os.environ.copy()
     env.setdefault("PYTHONIOENCODING", "utf-8")
     env.setdefault("LANG", "C.UTF-8")
+    return env
+
+
+def _spawn_stderr(args: List[str], limit: int) -> Tuple[int, bytes]:
+    """posix_spawn fast path for run_proc_stderr: skips subprocess's fork/exec wrapper."""
+    r, w = os.pipe()
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        # Python ignores these at startup; subprocess restores them for its children too
+        pid = os.posix_spawnp(args[0], args, _proc_env(), file_actions=[
+            (os.POSIX_SPAWN_DUP2, devnull, 1),
+            (os.POSIX_SPAWN_DUP2, w, 2),
+        ], setsigdef=(signal.SIGPIPE, signal.SIGXFSZ))
+    except BaseException:
+        os.close(r)
+        raise
+    finally:
+        os.close(w)
+        os.close(devnull)
+    try:
+        with os.fdopen(r, "rb") as err:
+            err_b = err.read(limit)
+            if len(err_b) == limit:
+                os.kill(pid, signal.SIGKILL)
+        _, status = os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        finally:
+            os.waitpid(pid, 0)
+        raise
+    return os.waitstatus_to_exitcode(status), err_b
+
+
+def run_proc_stderr(args: List[str], limit: int = 8192) -> Tuple[int, str]:
+    """Run a decode/check tool with stdout discarded.
+
+    Returns the exit code and at most `limit` bytes of stderr. A tool that
+    fills the limit has already failed loudly, so it is killed there rather
+    than left to decode the rest of a corrupt file.
+    """
+    if hasattr(os, "posix_spawnp"):
+        code, err_b = _spawn_stderr(args, limit)
+        return code, _decode_bytes(err_b).strip()
     proc = subprocess.Popen(
-        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=False, env=env,
+        args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=_proc_env(),
+        creationflags=_NO_WINDOW,
     )
     try:
-        out_b, err_b = proc.communicate()
+        with proc.stderr:
+            err_b = proc.stderr.read(limit)
+            if len(err_b) == limit:
+                proc.kill()
+        code = proc.wait()
     except KeyboardInterrupt:
         try:
             proc.kill()
         finally:
             proc.wait()
         raise
-    return proc.returncode, _decode_bytes(out_b).strip(), _decode_bytes(err_b).strip()
+    return code, _decode_bytes(err_b).strip()
+
+
+@functools.lru_cache(maxsize=None)
+def which_tool(name: str) -> Optional[str]:
+    """Resolve a tool on PATH once per run; None if it isn't installed."""
+    return shutil.which(name)
 
 
 def has_tool(name: str) -> bool:
-    return shutil.which(name) is not None
+    return which_tool(name) is not None
 
 
 def _has_cover_file(directory: str) -> bool:
@@ -157,11 +388,16 @@ class _TUIPbar:
         self.total = total
         self.desc = desc
         self.current = 0
+        self._shown_pct = 0
         self.draw()
 
     def update(self, n: int = 1) -> None:
         self.current += n
-        self.draw()
+        # The box only shows whole percents; skip repaints that wouldn't change it
+        pct = 100 * self.current // max(1, self.total)
+        if pct != self._shown_pct:
+            self._shown_pct = pct
+            self.draw()
 
     def draw(self) -> None:
         import curses
@@ -206,18 +442,25 @@ class _TUIPbar:
 
 class _FallbackProgress:
     """Simple progress bar for when tqdm is not installed."""
-    __slots__ = ('_current', '_total', '_desc', '_quiet')
+    __slots__ = ('_current', '_total', '_desc', '_quiet', '_last_draw')
 
     def __init__(self, total: int, desc: str, quiet: bool):
         self._current = 0
         self._total = total
         self._desc = desc
         self._quiet = quiet
+        self._last_draw = 0.0
 
     def update(self, n: int = 1) -> None:
+        """Redraw at most every _PROGRESS_INTERVAL seconds, always on the last file."""
         self._current += n
-        if not self._quiet:
-            update_progress(self._current, self._total, self._desc)
+        if self._quiet:
+            return
+        now = time.monotonic()
+        if self._current < self._total and now - self._last_draw < _PROGRESS_INTERVAL:
+            return
+        self._last_draw = now
+        update_progress(self._current, self._total, self._desc)
 
     def close(self) -> None:
         pass